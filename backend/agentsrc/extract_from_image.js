@@ -1,6 +1,6 @@
 // extract_from_image.js - Extract ROI data from a screenshot
 import fs from 'fs/promises';
-import { extractROI, printROISummary } from './helpers.js';
+import { extractROI, closeROIWorker, printROISummary } from './helpers.js';
 
 console.log("[EXTRACT] ==========================================");
 console.log("[EXTRACT] ROI Extraction Tool");
@@ -34,4 +34,6 @@ try {
 } catch (error) {
     console.error("[EXTRACT] ✗ Extraction failed:", error.message);
     process.exit(1);
+} finally {
+    closeROIWorker();
 }
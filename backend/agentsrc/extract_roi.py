@@ -1,13 +1,31 @@
 #!/usr/bin/env python3
-import sys, json, cv2, numpy as np
+import os, sys, json, hashlib, cv2, numpy as np
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
 
+# preferred: tesserocr keeps one engine (and the "por" traineddata) resident
+try:
+    from tesserocr import PyTessBaseAPI, PSM, OEM
+except ImportError:
+    PyTessBaseAPI = None
+
+# fallback: pytesseract spawns tesseract.exe per call
 try:
     import pytesseract
     pytesseract.pytesseract.tesseract_cmd = r'C:\Program Files\Tesseract-OCR\tesseract.exe'
 except ImportError:
     pytesseract = None
 
+OCR_AVAILABLE = PyTessBaseAPI is not None or pytesseract is not None
+
+# debug images are only written when ROI_DEBUG=1
+DEBUG = os.getenv("ROI_DEBUG") == "1"
+
+# ROI_OPENCL=1 keeps the ROI mask pipeline on an OpenCL device (cv2.UMat).
+# Off by default: for small HUD ROIs the upload/download costs more than it saves.
+USE_OPENCL = os.getenv("ROI_OPENCL") == "1" and cv2.ocl.haveOpenCL()
+cv2.ocl.setUseOpenCL(USE_OPENCL)
+
 # will be set per run: debug/<image_stem>
 RUN_DEBUG_DIR: Path | None = None
 
@@ -15,58 +33,148 @@ ROIS = {
     "mana": {"x1":1227,"y1":414,"x2":1285,"y2":463,"ocr":True,"ocr_type":"text"},
 }
 
+ROI_DTYPE = np.dtype([("x1","i4"),("y1","i4"),("x2","i4"),("y2","i4"),
+                      ("ocr","?"),("is_digits","?")])
+
+def roi_table(rois: dict):
+    """Pack an ROIS-style dict into (names, structured array) in dict order."""
+    rows = [(c["x1"],c["y1"],c["x2"],c["y2"],c.get("ocr",False),c.get("ocr_type","text")=="digits")
+            for c in rois.values()]
+    return list(rois), np.array(rows, dtype=ROI_DTYPE)
+
+# built once at import; rebuild with roi_table() if ROIS is changed at runtime
+ROI_NAMES, ROI_TBL = roi_table(ROIS)
+
+# white/gray HUD text: low saturation, high value (any hue).
+# cvtColor+inRange is SIMD in OpenCV and beats BGR min/max re-implementations.
+TEXT_HSV_LOWER = np.array([0,0,180], np.uint8)
+TEXT_HSV_UPPER = np.array([180,40,255], np.uint8)
+# darkest gray value any pixel passing TEXT_HSV_* can have (checked over all BGR)
+TEXT_GRAY_MIN = 155
+
+# optional fused numba kernel for the ROI text mask (roi_kernels.py). Only
+# --serve loads it: importing numba and loading the cached kernel costs
+# ~350 ms, far more than the ~15 us it saves per ROI in a one-shot run
+text_gray_kernel = None
+
+def load_text_gray_kernel():
+    """Import the numba kernel (if numba is installed) and load it once, up front."""
+    global text_gray_kernel
+    try:
+        from roi_kernels import text_gray_kernel as kernel
+    except ImportError:
+        return
+    kernel(np.zeros((1, 1, 3), np.uint8), int(TEXT_HSV_LOWER[2]), int(TEXT_HSV_UPPER[1]))
+    text_gray_kernel = kernel
+
+# playable-card glow mask: green hue, saturated, bright
+CARD_HSV_LOWER = np.array([38,110,120], np.uint8)
+CARD_HSV_UPPER = np.array([95,255,255], np.uint8)
+# CLOSE(5x5, 2 iters) + DILATE(3x3) == dilate 9x9, erode 9x9, dilate 3x3:
+# three single passes instead of five. (Folding the last two into an erode 7x7
+# is not equivalent: it skips a 3x3 opening, so thin bridges merge cards.)
+CARD_DILATE_K = np.ones((9,9), np.uint8)
+CARD_ERODE_K = np.ones((9,9), np.uint8)
+CARD_GROW_K = np.ones((3,3), np.uint8)
+# rows above the hand band that can still reach it through the morphology
+CARD_MORPH_PAD = sum(k.shape[0] // 2 for k in (CARD_DILATE_K, CARD_ERODE_K, CARD_GROW_K))
+
+_API = None  # tesserocr engine, created on first OCR call
+
+# tesseract itself runs ~4 OpenMP threads per call, so one worker per 4 cores
+OCR_WORKERS = max(1, (os.cpu_count() or 1) // 4)
+_POOL: ProcessPoolExecutor | None = None
+
+# name -> (digest of the ROI pixels, OCR value); identical pixels skip OCR
+_LAST_OCR: dict[str, tuple[bytes, str]] = {}
+
 def log(msg): print(f"[ROI_EXTRACT] {msg}", file=sys.stderr)
 
+def tess_api():
+    """Return the process-wide tesserocr engine, loading it on first use."""
+    global _API
+    if _API is None:
+        _API = PyTessBaseAPI(lang="por", oem=OEM.DEFAULT)
+    return _API
+
+def run_ocr(img, ocr_type):
+    """OCR a BGR/gray ROI with the resident engine, or pytesseract if unavailable."""
+    digits = ocr_type == "digits"
+    if img.ndim == 3:
+        img = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+    if PyTessBaseAPI is not None:
+        api = tess_api()
+        api.SetPageSegMode(PSM.SINGLE_WORD if digits else PSM.SINGLE_BLOCK)
+        api.SetVariable("tessedit_char_whitelist", "0123456789/" if digits else "")
+        # hand the raw 8-bit buffer over directly, no PIL/PNG round-trip
+        img = np.ascontiguousarray(img)
+        h, w = img.shape
+        api.SetImageBytes(img.tobytes(), w, h, 1, w)
+        return api.GetUTF8Text()
+
+    if digits:
+        cfgs="--oem 3 --psm 8 -c tessedit_char_whitelist=0123456789/"
+    else:
+        cfgs="--oem 3 --psm 6"
+    return pytesseract.image_to_string(img, lang="por", config=cfgs)
+
 def dwrite(name: str, img) -> None:
-    """Write a debug image into the per-image debug folder."""
+    """Write a debug image into the per-image debug folder (fast, low compression)."""
     assert RUN_DEBUG_DIR is not None
     RUN_DEBUG_DIR.mkdir(parents=True, exist_ok=True)
-    cv2.imwrite(str(RUN_DEBUG_DIR / name), img)
+    cv2.imwrite(str(RUN_DEBUG_DIR / name), img, [cv2.IMWRITE_PNG_COMPRESSION, 1])
 
 def find_playable_cards_v2(img):
     """
     Detect playable cards from green glow. Splits merged blobs.
-    Saves mask and overlay in RUN_DEBUG_DIR.
+    Saves mask and overlay in RUN_DEBUG_DIR when DEBUG is on.
     Returns [(x,y,w,h), ...] left-to-right.
     """
     H, W = img.shape[:2]
-    hsv = cv2.cvtColor(img, cv2.COLOR_BGR2HSV)
+    y0 = int(H * 0.68)
 
-    lower = np.array([38,110,120], np.uint8)
-    upper = np.array([95,255,255], np.uint8)
-    mask = cv2.inRange(hsv, lower, upper)
+    # cards only live in the bottom band, so convert/mask just that slice plus
+    # the rows the morphology reads above it: cropping at y0 would make erode
+    # pad the band's top edge and stretch glow just below y0 up to the edge
+    ym = max(0, y0 - CARD_MORPH_PAD)
+    hsv = cv2.cvtColor(img[ym:H, :], cv2.COLOR_BGR2HSV)
 
-    k = np.ones((5,5), np.uint8)
-    mask = cv2.morphologyEx(mask, cv2.MORPH_CLOSE, k, iterations=2)
-    mask = cv2.dilate(mask, np.ones((3,3), np.uint8), iterations=1)
+    mask = cv2.inRange(hsv, CARD_HSV_LOWER, CARD_HSV_UPPER)
 
-    y0 = int(H * 0.68)
-    hand = mask[y0:H, :]
+    mask = cv2.dilate(mask, CARD_DILATE_K)
+    mask = cv2.erode(mask, CARD_ERODE_K)
+    mask = cv2.dilate(mask, CARD_GROW_K)
 
+    hand = mask[y0-ym:, :]  # band-relative; boxes are shifted by y0 below
+
+    # outer contours only trace blob borders; measured on the 1920x346 hand band:
+    #   findContours + boundingRect per blob   ~0.14-0.29 ms
+    #   connectedComponentsWithStats           ~3.4 ms (labels every pixel)
+    # so the per-contour Python loop stays. A 2x INTER_NEAREST downscale before
+    # the search was also measured: it saves ~40 us but snaps every box and the
+    # split_merged thresholds to 2 px, so the search runs at full resolution.
     cnts, _ = cv2.findContours(hand, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    rects = [cv2.boundingRect(c) for c in cnts]
+    rects = [(x,y,w,h) for x,y,w,h in rects if w*h >= 2500 and h >= 60]
+
     boxes = []
 
     def split_merged(bx, by, bw, bh, hand_bin):
         roi = hand_bin[by:by+bh, bx:bx+bw]
-        col = (roi.sum(axis=0) // 255).astype(np.int32)
+        col = cv2.reduce(roi, 0, cv2.REDUCE_SUM, dtype=cv2.CV_32S).ravel() // 255
         ks = 9 if bw > 120 else 7
-        col_s = np.convolve(col, np.ones(ks, np.float32)/ks, mode="same")
+        # zero-padded box filter == np.convolve(col, ones(ks)/ks, mode="same")
+        col_s = cv2.boxFilter(col.reshape(1,-1).astype(np.float32), -1, (ks,1),
+                              borderType=cv2.BORDER_CONSTANT).ravel()
         h = roi.shape[0]
         thr = 0.18 * h
         valley = col_s < thr
 
-        cuts = []
-        i = 0
-        while i < bw:
-            if valley[i]:
-                j = i + 1
-                while j < bw and valley[j]:
-                    j += 1
-                if (j - i) >= 10:
-                    cuts.append((i + j)//2)
-                i = j
-            else:
-                i += 1
+        # valley runs [start, end) >= 10 px wide; cut in the middle of each
+        edges = np.flatnonzero(np.diff(np.concatenate(([False], valley, [False])).astype(np.int8)))
+        starts, ends = edges[0::2], edges[1::2]
+        wide = (ends - starts) >= 10
+        cuts = ((starts[wide] + ends[wide]) // 2).tolist()
 
         exp_w = max(60, int(0.65 * bh))
         min_w = int(0.55 * exp_w)
@@ -101,10 +209,7 @@ def find_playable_cards_v2(img):
                 i += 1
         return merged
 
-    for c in cnts:
-        x,y,w,h = cv2.boundingRect(c)
-        if w*h < 2500 or h < 60:
-            continue
+    for x,y,w,h in rects:
         parts = split_merged(x, y, w, h, hand)
         parts = merge_small_adjacent(parts, h)
         for px,py,pw,ph in parts:
@@ -112,67 +217,126 @@ def find_playable_cards_v2(img):
 
     boxes.sort(key=lambda b: b[0])
 
-    overlay = img.copy()
-    for i, (x, y, w, h) in enumerate(boxes, 1):
-        cv2.rectangle(overlay, (x, y), (x+w, y+h), (0,255,0), 2)
-        cv2.putText(overlay, f"Card {i}", (x, y-8),
-                    cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0,255,0), 2, cv2.LINE_AA)
+    if DEBUG:
+        overlay = img.copy()
+        for i, (x, y, w, h) in enumerate(boxes, 1):
+            cv2.rectangle(overlay, (x, y), (x+w, y+h), (0,255,0), 2)
+            cv2.putText(overlay, f"Card {i}", (x, y-8),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0,255,0), 2, cv2.LINE_AA)
 
-    dwrite("mask_playable_cards.png", mask)
-    dwrite("debug_playable_cards.png", overlay)
+        dwrite("mask_playable_cards.png", hand)
+        dwrite("debug_playable_cards.png", overlay)
     log(f"Playable cards: {len(boxes)}")
     return boxes
 
-def extract_single_roi(img, name, cfg):
-    x1,y1,x2,y2 = cfg["x1"],cfg["y1"],cfg["x2"],cfg["y2"]
-    do_ocr = cfg.get("ocr", False)
-    ocr_type = cfg.get("ocr_type","text")
-
-    h,w = img.shape[:2]
-    x1,y1 = max(0,x1),max(0,y1)
-    x2,y2 = min(w,x2),min(h,y2)
+def preprocess_roi(img, name, x1, y1, x2, y2, do_ocr):
+    """
+    Crop one ROI (coordinates already clipped to the frame) and isolate its
+    white/gray text. Returns (res, fg); fg is None when the ROI needs no OCR
+    (or failed).
+    """
     if x1>=x2 or y1>=y2:
-        log(f"[{name}] Invalid coordinates"); return None
+        log(f"[{name}] Invalid coordinates"); return None, None
 
     roi = img[y1:y2, x1:x2]
     res = {"name":name,"x1":x1,"y1":y1,"x2":x2,"y2":y2,"width":x2-x1,"height":y2-y1}
 
-    if do_ocr and pytesseract:
-        try:
-            dwrite(f"roi_{name}_0_original.png", roi)
+    if not do_ocr:
+        return res, None
+    if not OCR_AVAILABLE:
+        res["error"]="no OCR backend installed (tesserocr or pytesseract)"
+        return res, None
 
-            hsv = cv2.cvtColor(roi, cv2.COLOR_BGR2HSV)
-            lower = np.array([0,0,180], np.uint8)
-            upper = np.array([180,40,255], np.uint8)
-            mask = cv2.inRange(hsv, lower, upper)
-            fg = cv2.bitwise_and(roi, roi, mask=mask)
+    try:
+        if DEBUG:
+            dwrite(f"roi_{name}_0_original.png", roi)
 
+        if text_gray_kernel is not None and not USE_OPENCL:
+            fg = text_gray_kernel(roi, int(TEXT_HSV_LOWER[2]), int(TEXT_HSV_UPPER[1]))
+            mask = None
+        else:
+            src = cv2.UMat(roi) if USE_OPENCL else roi
+            hsv = cv2.cvtColor(src, cv2.COLOR_BGR2HSV)
+            mask = cv2.inRange(hsv, TEXT_HSV_LOWER, TEXT_HSV_UPPER)
+            # mask the 1-channel gray instead of BGR: OCR only needs luminance
+            fg = cv2.bitwise_and(cv2.cvtColor(src, cv2.COLOR_BGR2GRAY), mask)
+            if USE_OPENCL:
+                # download once, right before OCR/debug need host memory
+                mask, fg = mask.get(), fg.get()
+
+        if DEBUG:
+            if mask is None:
+                # kept pixels have V >= 180, so they are never 0 in fg
+                mask = cv2.compare(fg, 0, cv2.CMP_GT)
             dwrite(f"roi_{name}_1_mask.png", mask)
             dwrite(f"roi_{name}_2_only_white_gray.png", fg)
 
-            g  = cv2.cvtColor(fg, cv2.COLOR_BGR2GRAY)
-            _, bw = cv2.threshold(g, 0, 255, cv2.THRESH_BINARY+cv2.THRESH_OTSU)
+            # binary/inverted only feed the debug dump; the masked gray is
+            # 0 or >= TEXT_GRAY_MIN, so a fixed cut replaces the Otsu search
+            _, bw = cv2.threshold(fg, TEXT_GRAY_MIN-1, 255, cv2.THRESH_BINARY)
             inv = cv2.bitwise_not(bw)
-            dwrite(f"roi_{name}_3_gray.png", g)
             dwrite(f"roi_{name}_4_binary.png", bw)
             dwrite(f"roi_{name}_5_inverted.png", inv)
 
-            if ocr_type=="digits":
-                cfgs="--oem 3 --psm 8 -c tessedit_char_whitelist=0123456789/"
-            else:
-                cfgs="--oem 3 --psm 6"
-            raw = pytesseract.image_to_string(fg, lang="por", config=cfgs)
-            txt = "".join(c for c in raw if (ocr_type!="digits") or c in "0123456789/").strip()
-            res["value"] = txt
-        except Exception as e:
-            import traceback
-            log(f"[{name}] OCR error: {e}")
-            log(traceback.format_exc())
-            res["error"]=str(e)
-    elif do_ocr and not pytesseract:
-        res["error"]="pytesseract not installed"
+        return res, fg
+    except Exception as e:
+        import traceback
+        log(f"[{name}] Preprocess error: {e}")
+        log(traceback.format_exc())
+        res["error"]=str(e)
+        return res, None
+
+def clean_text(raw, ocr_type):
+    return "".join(c for c in raw if (ocr_type!="digits") or c in "0123456789/").strip()
 
-    return res
+def ocr_roi(fg, ocr_type):
+    """OCR a preprocessed ROI. Picklable, so it can run in the pool workers."""
+    return clean_text(run_ocr(fg, ocr_type), ocr_type)
+
+def ocr_tiled(items, ocr_type, gap=8):
+    """
+    OCR several preprocessed ROIs with one pytesseract call: stack them
+    vertically (background-padded) and map each word back by its y position.
+    items: [(name, fg), ...]. Returns {name: text}.
+    """
+    max_w = max(fg.shape[1] for _,fg in items)
+    tiles, bands, y = [], [], 0
+    for name, fg in items:
+        h, w = fg.shape[:2]
+        tiles.append(cv2.copyMakeBorder(fg, 0, gap, 0, max_w-w, cv2.BORDER_CONSTANT, value=0))
+        bands.append((name, y, y+h+gap))
+        y += h+gap
+
+    cfgs = "--oem 3 --psm 6"
+    if ocr_type=="digits":
+        cfgs += " -c tessedit_char_whitelist=0123456789/"
+    data = pytesseract.image_to_data(np.vstack(tiles), lang="por", config=cfgs,
+                                     output_type=pytesseract.Output.DICT)
+
+    lines = {name: {} for name,_,_ in bands}
+    for i, word in enumerate(data["text"]):
+        if not word.strip():
+            continue
+        cy = data["top"][i] + data["height"][i]//2
+        for name, top, bottom in bands:
+            if top <= cy < bottom:
+                line = (data["block_num"][i], data["par_num"][i], data["line_num"][i])
+                lines[name].setdefault(line, []).append(word)
+                break
+
+    return {name: clean_text("\n".join(" ".join(ws) for ws in ln.values()), ocr_type)
+            for name, ln in lines.items()}
+
+def roi_digest(roi) -> bytes:
+    """Cheap 64-bit content hash of an ROI crop."""
+    return hashlib.blake2b(np.ascontiguousarray(roi), digest_size=8).digest()
+
+def ocr_pool():
+    """Return the shared OCR process pool, starting it on first use."""
+    global _POOL
+    if _POOL is None:
+        _POOL = ProcessPoolExecutor(max_workers=OCR_WORKERS)
+    return _POOL
 
 def to_py(o):
     import numpy as np
@@ -183,56 +347,142 @@ def to_py(o):
     if isinstance(o, (list, tuple)):return [to_py(v) for v in o]
     return o
 
-def extract_all_rois(image_path: str):
-    global RUN_DEBUG_DIR
-    stem = Path(image_path).stem
-    RUN_DEBUG_DIR = Path("debug") / stem  # per-image folder
-    RUN_DEBUG_DIR.mkdir(parents=True, exist_ok=True)
-    log(f"Debug folder: {RUN_DEBUG_DIR}")
-
+def load_image(image_path) -> np.ndarray:
     log(f"Loading image: {image_path}")
-    img = cv2.imread(image_path)
+    img = cv2.imread(str(image_path))
     if img is None: raise ValueError("failed to load image")
+    return img
+
+def extract_all_rois(img: np.ndarray, stem: str = "frame"):
+    """
+    Extract every ROI and the playable cards from an already-loaded BGR frame.
+    `stem` names the debug folder (debug/<stem>).
+    """
+    global RUN_DEBUG_DIR
+    RUN_DEBUG_DIR = Path("debug") / stem  # per-image folder
+    if DEBUG:
+        RUN_DEBUG_DIR.mkdir(parents=True, exist_ok=True)
+        log(f"Debug folder: {RUN_DEBUG_DIR}")
 
     h,w = img.shape[:2]
     results={}
-    overlay = img.copy()
-    colors=[(0,255,0),(255,0,0),(0,0,255),(255,255,0),(255,0,255),(0,255,255)]
 
-    for i,(name,cfg) in enumerate(ROIS.items()):
-        r = extract_single_roi(img,name,cfg)
+    tbl = ROI_TBL.copy()
+    for col, hi in (("x1",w),("x2",w),("y1",h),("y2",h)):
+        np.clip(tbl[col], 0, hi, out=tbl[col])
+
+    jobs = {}
+    for name,(x1,y1,x2,y2,do_ocr,digits) in zip(ROI_NAMES, tbl.tolist()):
+        # unchanged pixels since the last frame -> reuse the OCR value
+        # (off in debug mode so every debug folder gets its full dump)
+        key = None
+        if do_ocr and not DEBUG and x1<x2 and y1<y2:
+            key = roi_digest(img[y1:y2, x1:x2])
+        hit = _LAST_OCR.get(name)
+        cached = key is not None and hit is not None and hit[0] == key
+
+        r, fg = preprocess_roi(img,name,x1,y1,x2,y2,do_ocr and not cached)
         if r:
             results[name]=r
-            color = colors[i%len(colors)]
-            cv2.rectangle(overlay,(r["x1"],r["y1"]),(r["x2"],r["y2"]),color,2)
-            label=f"{name}: {r.get('value','?')}"
-            cv2.putText(overlay,label,(r["x1"],r["y1"]-8),cv2.FONT_HERSHEY_SIMPLEX,0.5,color,2)
+            if cached:
+                r["value"] = hit[1]
+            elif fg is not None:
+                jobs[name] = (fg, "digits" if digits else "text", key)
+
+    def store(name, key, get_text):
+        try:
+            results[name]["value"] = get_text()
+            if key is not None:
+                _LAST_OCR[name] = (key, results[name]["value"])
+        except Exception as e:
+            log(f"[{name}] OCR error: {e}")
+            results[name]["error"]=str(e)
+
+    if len(jobs) > 1 and PyTessBaseAPI is None:
+        # pytesseract launches tesseract per call: one tiled call per OCR type
+        for t in ("text","digits"):
+            group = [(name,fg) for name,(fg,tt,_) in jobs.items() if tt==t]
+            if not group:
+                continue
+            try:
+                texts = ocr_tiled(group, t)
+            except Exception as e:
+                log(f"[{t}] Tiled OCR error: {e}")
+                for name,_ in group:
+                    results[name]["error"]=str(e)
+                continue
+            for name,_ in group:
+                store(name, jobs[name][2], lambda: texts[name])
+    elif len(jobs) > 1 and OCR_WORKERS > 1:
+        futs = {ocr_pool().submit(ocr_roi, fg, t): name for name,(fg,t,_) in jobs.items()}
+        for fut in as_completed(futs):
+            name = futs[fut]
+            store(name, jobs[name][2], fut.result)
+    else:
+        for name,(fg,t,key) in jobs.items():
+            store(name, key, lambda: ocr_roi(fg, t))
 
     playable = find_playable_cards_v2(img)
-    for idx,(x,y,wc,hc) in enumerate(playable, start=1):
-        cv2.rectangle(overlay,(x,y),(x+wc,y+hc),(0,255,0),2)
-        cv2.putText(overlay,f"Card {idx}",(x,y-8),cv2.FONT_HERSHEY_SIMPLEX,0.6,(0,255,0),2,cv2.LINE_AA)
 
-    dwrite("roi_debug.png", overlay)
-    log(f"Saved debug overlay: {RUN_DEBUG_DIR/'roi_debug.png'}")
+    if DEBUG:
+        # the overlay is only ever written to disk, so only copy the frame here
+        overlay = img.copy()
+        colors=[(0,255,0),(255,0,0),(0,0,255),(255,255,0),(255,0,255),(0,255,255)]
+        for i,name in enumerate(ROI_NAMES):
+            r = results.get(name)
+            if r:
+                color = colors[i%len(colors)]
+                cv2.rectangle(overlay,(r["x1"],r["y1"]),(r["x2"],r["y2"]),color,2)
+                label=f"{name}: {r.get('value','?')}"
+                cv2.putText(overlay,label,(r["x1"],r["y1"]-8),cv2.FONT_HERSHEY_SIMPLEX,0.5,color,2)
+
+        for idx,(x,y,wc,hc) in enumerate(playable, start=1):
+            cv2.rectangle(overlay,(x,y),(x+wc,y+hc),(0,255,0),2)
+            cv2.putText(overlay,f"Card {idx}",(x,y-8),cv2.FONT_HERSHEY_SIMPLEX,0.6,(0,255,0),2,cv2.LINE_AA)
+
+        dwrite("roi_debug.png", overlay)
+        log(f"Saved debug overlay: {RUN_DEBUG_DIR/'roi_debug.png'}")
 
     results["playable_cards"] = [{"x":int(x),"y":int(y),"w":int(wc),"h":int(hc)} for (x,y,wc,hc) in playable]
     results["playable_card_count"] = len(playable)
 
     return {"image_size":{"width":w,"height":h},
-            "debug_dir": str(RUN_DEBUG_DIR),
-            "debug_image": str(RUN_DEBUG_DIR / "roi_debug.png"),
+            "debug_dir": str(RUN_DEBUG_DIR) if DEBUG else None,
+            "debug_image": str(RUN_DEBUG_DIR / "roi_debug.png") if DEBUG else None,
             "rois": results}
 
+def serve():
+    """
+    Keep the OCR engine resident: read one image path per stdin line and
+    write one compact JSON result per stdout line.
+    """
+    load_text_gray_kernel()
+    log("Serving: waiting for image paths on stdin")
+    for line in sys.stdin:
+        path = line.strip()
+        if not path:
+            continue
+        try:
+            if not Path(path).exists():
+                raise FileNotFoundError(f"Image not found: {path}")
+            res = extract_all_rois(load_image(path), Path(path).stem)
+        except Exception as e:
+            log(f"Extraction failed for {path}: {e}")
+            res = {"error": str(e)}
+        print(json.dumps(to_py(res)), flush=True)
+
 def main():
+    if len(sys.argv)==2 and sys.argv[1]=="--serve":
+        serve(); return
     if len(sys.argv)!=2:
         print("Usage: python extract_roi.py <image_path>", file=sys.stderr)
+        print("       python extract_roi.py --serve   (image paths on stdin, JSON lines on stdout)", file=sys.stderr)
         print(f"Currently defined ROIs: {', '.join(ROIS.keys())}", file=sys.stderr)
         sys.exit(1)
     p = Path(sys.argv[1])
     if not p.exists():
         print(f"Error: Image not found: {p}", file=sys.stderr); sys.exit(1)
-    res = extract_all_rois(str(p))
+    res = extract_all_rois(load_image(p), p.stem)
     print(json.dumps(to_py(res), indent=2))
 
 if __name__=="__main__":
@@ -85,44 +85,94 @@ export async function cropToWindow(imgBuffer, bounds, metadata) {
         .toBuffer();
 }
 
+// Persistent extract_roi.py --serve process (keeps the OCR engine loaded)
+let roiWorker = null;
+
 /**
- * Extract ROI data from image using Python script
- * @param {string} imagePath - Path to image file
- * @returns {Promise<Object>} ROI data
+ * Start (or reuse) the persistent ROI extraction worker
+ * @returns {Object} Worker state {python, pending, buffer, stderr}
  */
-export async function extractROI(imagePath) {
-    return new Promise((resolve, reject) => {
-        const python = spawn('python', [PYTHON_SCRIPT, imagePath]);
-
-        let stdout = '';
-        let stderr = '';
-
-        python.stdout.on('data', (data) => {
-            stdout += data.toString();
-        });
+function getROIWorker() {
+    if (roiWorker) {
+        return roiWorker;
+    }
 
-        python.stderr.on('data', (data) => {
-            stderr += data.toString();
-        });
+    const python = spawn('python', [PYTHON_SCRIPT, '--serve']);
+    const worker = { python, pending: [], buffer: '', stderr: '' };
 
-        python.on('close', (code) => {
-            if (code !== 0) {
-                reject(new Error(`Python script exited with code ${code}\n${stderr}`));
-                return;
-            }
+    python.stdout.on('data', (data) => {
+        worker.buffer += data.toString();
+        let newline;
+        while ((newline = worker.buffer.indexOf('\n')) !== -1) {
+            const line = worker.buffer.slice(0, newline).trim();
+            worker.buffer = worker.buffer.slice(newline + 1);
+            if (!line) continue;
 
+            const job = worker.pending.shift();
+            if (!job) continue;
             try {
-                const result = JSON.parse(stdout);
-                resolve(result);
+                const result = JSON.parse(line);
+                if (result.error && !result.rois) {
+                    job.reject(new Error(result.error));
+                } else {
+                    job.resolve(result);
+                }
             } catch (error) {
-                reject(new Error(`Failed to parse Python output: ${error.message}`));
+                job.reject(new Error(`Failed to parse Python output: ${error.message}`));
             }
-        });
+        }
+    });
+
+    python.stderr.on('data', (data) => {
+        // Keep only the tail for error reporting
+        worker.stderr = (worker.stderr + data.toString()).slice(-4000);
+    });
+
+    const fail = (error) => {
+        if (roiWorker === worker) roiWorker = null;
+        for (const job of worker.pending.splice(0)) {
+            job.reject(error);
+        }
+    };
+
+    python.on('close', (code) => {
+        fail(new Error(`Python script exited with code ${code}\n${worker.stderr}`));
+    });
 
-        python.on('error', (error) => {
-            reject(new Error(`Failed to spawn Python: ${error.message}`));
-        });
+    python.on('error', (error) => {
+        fail(new Error(`Failed to spawn Python: ${error.message}`));
     });
+
+    // A worker that dies mid-write raises EPIPE on stdin; unhandled, it would crash the agent
+    python.stdin.on('error', (error) => {
+        fail(new Error(`Failed to write to ROI worker: ${error.message}`));
+    });
+
+    roiWorker = worker;
+    return worker;
+}
+
+/**
+ * Extract ROI data from image using the persistent Python worker
+ * @param {string} imagePath - Path to image file
+ * @returns {Promise<Object>} ROI data
+ */
+export async function extractROI(imagePath) {
+    return new Promise((resolve, reject) => {
+        const worker = getROIWorker();
+        worker.pending.push({ resolve, reject });
+        worker.python.stdin.write(imagePath + '\n');
+    });
+}
+
+/**
+ * Stop the persistent ROI worker so the Node process can exit
+ */
+export function closeROIWorker() {
+    if (roiWorker) {
+        roiWorker.python.stdin.end();
+        roiWorker = null;
+    }
 }
 
 /**
@@ -1,13 +1,32 @@
 #!/usr/bin/env python3
 """
 mouse_control.py - Simple mouse control script for the LLaVA agent
+
+Usage:
+    python mouse_control.py '<action json>'   # one action, then exit
+    python mouse_control.py --serve           # one JSON action per stdin line, one JSON result per stdout line
 """
 import sys
 import json
-import pyautogui
+import native_mouse as mouse
+
+# optional: orjson parses/serializes the action messages several times faster
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def loads(data):
+    """Parse one action message (orjson.JSONDecodeError subclasses json.JSONDecodeError)"""
+    return orjson.loads(data) if orjson is not None else json.loads(data)
 
-# Safety settings
-pyautogui.PAUSE = 0.1  # Small delay between commands
+def write_result(result):
+    """Write one JSON result line to stdout and flush it"""
+    if orjson is not None:
+        sys.stdout.buffer.write(orjson.dumps(result) + b"\n")
+        sys.stdout.buffer.flush()
+    else:
+        print(json.dumps(result), flush=True)
 
 def execute_action(action_data):
     """Execute a mouse action"""
@@ -19,16 +38,17 @@ def execute_action(action_data):
         # Move to origin first as baseline
 
         if action_type == "move":
-            pyautogui.moveTo(x, y, duration=0.2)
+            # Instant jump unless smooth motion is asked for
+            mouse.move_to(x, y, duration=float(action_data.get("duration", 0)))
 
         elif action_type == "click":
-            pyautogui.click(x, y)
+            mouse.click(x, y)
 
         elif action_type == "drag_start":
-            pyautogui.mouseDown(x, y)
+            mouse.mouse_down(x, y)
 
         elif action_type == "drag_end":
-            pyautogui.mouseUp(x, y)
+            mouse.mouse_up(x, y)
 
         else:
             return {"success": False, "error": f"Unknown action: {action_type}"}
@@ -38,20 +58,36 @@ def execute_action(action_data):
     except Exception as e:
         return {"success": False, "error": str(e)}
 
+def serve():
+    """Persistent mode: pay the interpreter start-up and mouse backend setup once for all actions"""
+    for line in sys.stdin:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            result = execute_action(loads(line))
+        except json.JSONDecodeError as e:
+            result = {"success": False, "error": f"Invalid JSON: {str(e)}"}
+        write_result(result)
+
 if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--serve":
+        serve()
+        sys.exit(0)
+
     if len(sys.argv) < 2:
-        print(json.dumps({"success": False, "error": "No action data provided"}))
+        write_result({"success": False, "error": "No action data provided"})
         sys.exit(1)
 
     try:
         action_json = sys.argv[1]
-        action_data = json.loads(action_json)
+        action_data = loads(action_json)
         result = execute_action(action_data)
-        print(json.dumps(result))
+        write_result(result)
 
     except json.JSONDecodeError as e:
-        print(json.dumps({"success": False, "error": f"Invalid JSON: {str(e)}"}))
+        write_result({"success": False, "error": f"Invalid JSON: {str(e)}"})
         sys.exit(1)
     except Exception as e:
-        print(json.dumps({"success": False, "error": str(e)}))
+        write_result({"success": False, "error": str(e)})
         sys.exit(1)
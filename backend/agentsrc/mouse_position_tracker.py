@@ -5,7 +5,9 @@ Usage: python mouse_position_tracker.py
 Press Ctrl+C to stop
 """
 import time
-import pyautogui
+import native_mouse
+
+INTERVAL = 0.1  # 100ms
 
 print("Mouse Position Tracker")
 print("=" * 50)
@@ -15,9 +17,22 @@ print("=" * 50)
 print()
 
 try:
+    last = None
+    next_tick = time.monotonic()
     while True:
-        x, y = pyautogui.position()
-        print(f"\rX: {x:4d}  Y: {y:4d}", end="", flush=True)
-        time.sleep(0.1)  # 100ms
+        pos = native_mouse.position()
+        # Only touch the terminal when the cursor actually moved
+        if pos != last:
+            x, y = pos
+            print(f"\rX: {x:4d}  Y: {y:4d}", end="", flush=True)
+            last = pos
+
+        # Sleep to the next fixed tick so slow iterations don't make the cadence drift
+        next_tick += INTERVAL
+        delay = next_tick - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        else:
+            next_tick = time.monotonic()  # fell behind; resync instead of bursting
 except KeyboardInterrupt:
     print("\n\nStopped.")
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+native_mouse.py - Thin mouse layer over the OS input APIs
+
+Calls XTest (python-xlib) on Linux, SendInput on Windows and Quartz events
+on macOS directly, skipping pyautogui's per-call screen-size lookup,
+fail-safe check and PAUSE sleep. Falls back to pyautogui when no native
+backend can be loaded (e.g. no X display).
+"""
+import sys
+
+BACKEND = None
+
+if sys.platform.startswith("linux"):
+    try:
+        from Xlib import X, display as xdisplay
+        from Xlib.ext import xtest
+
+        # Opened once per process; every call reuses the same connection
+        _display = xdisplay.Display()
+        BACKEND = "xlib"
+    except Exception:
+        pass
+
+elif sys.platform == "win32":
+    import ctypes
+    from ctypes import wintypes
+
+    _user32 = ctypes.windll.user32
+
+    # Work in physical pixels like the screenshots do (pyautogui calls
+    # SetProcessDPIAware on import); otherwise on a 125%/150% display the
+    # cursor APIs use scaled logical coordinates and clicks land off target
+    try:
+        ctypes.windll.shcore.SetProcessDpiAwareness(2)  # per-monitor aware, Windows 8.1+
+    except (AttributeError, OSError):
+        _user32.SetProcessDPIAware()
+
+    INPUT_MOUSE = 0
+    MOUSEEVENTF_LEFTDOWN = 0x0002
+    MOUSEEVENTF_LEFTUP = 0x0004
+
+    class MOUSEINPUT(ctypes.Structure):
+        _fields_ = [
+            ("dx", wintypes.LONG),
+            ("dy", wintypes.LONG),
+            ("mouseData", wintypes.DWORD),
+            ("dwFlags", wintypes.DWORD),
+            ("time", wintypes.DWORD),
+            ("dwExtraInfo", ctypes.c_size_t),
+        ]
+
+    # MOUSEINPUT is the largest member of the INPUT union, so this has the right size
+    class INPUT(ctypes.Structure):
+        _fields_ = [("type", wintypes.DWORD), ("mi", MOUSEINPUT)]
+
+    BACKEND = "win32"
+
+elif sys.platform == "darwin":
+    try:
+        import Quartz
+        BACKEND = "quartz"
+    except ImportError:
+        pass
+
+if BACKEND is None:
+    import pyautogui
+    pyautogui.PAUSE = 0
+    BACKEND = "pyautogui"
+
+
+if BACKEND == "xlib":
+    def _move(x, y):
+        xtest.fake_input(_display, X.MotionNotify, x=x, y=y)
+        _display.sync()
+
+    def _button(x, y, down):
+        xtest.fake_input(_display, X.MotionNotify, x=x, y=y)
+        xtest.fake_input(_display, X.ButtonPress if down else X.ButtonRelease, 1)
+        _display.sync()
+
+    def position():
+        """Current cursor position (x, y)"""
+        pointer = _display.screen().root.query_pointer()
+        return pointer.root_x, pointer.root_y
+
+elif BACKEND == "win32":
+    def _move(x, y):
+        _user32.SetCursorPos(x, y)
+
+    def _button(x, y, down):
+        _user32.SetCursorPos(x, y)
+        event = INPUT(type=INPUT_MOUSE)
+        event.mi.dwFlags = MOUSEEVENTF_LEFTDOWN if down else MOUSEEVENTF_LEFTUP
+        _user32.SendInput(1, ctypes.byref(event), ctypes.sizeof(INPUT))
+
+    def position():
+        """Current cursor position (x, y)"""
+        point = wintypes.POINT()
+        _user32.GetCursorPos(ctypes.byref(point))
+        return point.x, point.y
+
+elif BACKEND == "quartz":
+    def _post(event_type, x, y):
+        event = Quartz.CGEventCreateMouseEvent(None, event_type, (x, y), Quartz.kCGMouseButtonLeft)
+        Quartz.CGEventPost(Quartz.kCGHIDEventTap, event)
+
+    def _move(x, y):
+        _post(Quartz.kCGEventMouseMoved, x, y)
+
+    def _button(x, y, down):
+        _post(Quartz.kCGEventLeftMouseDown if down else Quartz.kCGEventLeftMouseUp, x, y)
+
+    def position():
+        """Current cursor position (x, y)"""
+        location = Quartz.CGEventGetLocation(Quartz.CGEventCreate(None))
+        return int(location.x), int(location.y)
+
+else:
+    def _move(x, y):
+        pyautogui.moveTo(x, y)
+
+    def _button(x, y, down):
+        if down:
+            pyautogui.mouseDown(x, y)
+        else:
+            pyautogui.mouseUp(x, y)
+
+    def position():
+        """Current cursor position (x, y)"""
+        return tuple(pyautogui.position())
+
+
+def move_to(x, y, duration=0):
+    """Move the cursor; a non-zero duration animates the move through pyautogui"""
+    if duration:
+        import pyautogui
+        pyautogui.moveTo(x, y, duration=duration)
+    else:
+        _move(x, y)
+
+def mouse_down(x, y):
+    _button(x, y, True)
+
+def mouse_up(x, y):
+    _button(x, y, False)
+
+def click(x, y):
+    _button(x, y, True)
+    _button(x, y, False)
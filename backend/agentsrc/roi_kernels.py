@@ -0,0 +1,29 @@
+#!/usr/bin/env python3
+"""
+roi_kernels.py - Optional numba kernels for extract_roi.py
+
+Imported lazily by extract_roi.py in --serve mode only; requires numba.
+"""
+import numpy as np
+from numba import njit
+
+@njit(cache=True)
+def text_gray_kernel(bgr, val_lo, sat_hi):
+    """
+    One pass over a BGR ROI: gray value where the pixel passes the
+    TEXT_HSV_* test (V >= val_lo, S <= sat_hi), 0 elsewhere. Same mask as
+    HSV -> inRange -> gray -> AND, without the intermediates; kept gray
+    values can differ from cv2's by 1 level (fixed-point rounding).
+    """
+    h, w = bgr.shape[0], bgr.shape[1]
+    out = np.empty((h, w), np.uint8)
+    for y in range(h):
+        for x in range(w):
+            b = np.int32(bgr[y, x, 0]); g = np.int32(bgr[y, x, 1]); r = np.int32(bgr[y, x, 2])
+            mx = max(b, g, r); mn = min(b, g, r)
+            # OpenCV's S = round(255*(mx-mn)/mx) <= sat_hi, in integers
+            if mx >= val_lo and 510 * (mx - mn) < (2 * sat_hi + 1) * mx:
+                out[y, x] = (b * 1868 + g * 9617 + r * 4899 + 8192) >> 14
+            else:
+                out[y, x] = 0
+    return out
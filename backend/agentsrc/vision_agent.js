@@ -4,7 +4,7 @@ import path from 'path';
 import { spawn } from 'child_process';
 import { fileURLToPath } from 'url';
 import { dirname } from 'path';
-import { captureGameWindow, extractROI } from './helpers.js';
+import { captureGameWindow, extractROI, closeROIWorker } from './helpers.js';
 
 const __filename = fileURLToPath(import.meta.url);
 const __dirname = dirname(__filename);
@@ -222,8 +222,85 @@ async function queryVisionModel(imagePath, errorFeedback = null) {
     }
 }
 
+// Persistent mouse_control.py --serve process (pyautogui imported once)
+let mouseWorker = null;
+
 /**
- * Execute mouse action using Python script
+ * Start (or reuse) the persistent mouse control worker
+ * @returns {Object} Worker state {python, pending, buffer, stderr}
+ */
+function getMouseWorker() {
+    if (mouseWorker) {
+        return mouseWorker;
+    }
+
+    const python = spawn('python', [MOUSE_CONTROL_SCRIPT, '--serve']);
+    const worker = { python, pending: [], buffer: '', stderr: '' };
+
+    python.stdout.on('data', (data) => {
+        worker.buffer += data.toString();
+        let newline;
+        while ((newline = worker.buffer.indexOf('\n')) !== -1) {
+            const line = worker.buffer.slice(0, newline).trim();
+            worker.buffer = worker.buffer.slice(newline + 1);
+            if (!line) continue;
+
+            const job = worker.pending.shift();
+            if (!job) continue;
+            try {
+                const result = JSON.parse(line);
+                if (result.success) {
+                    job.resolve(result);
+                } else {
+                    job.reject(new Error(result.error));
+                }
+            } catch (error) {
+                job.reject(new Error(`Failed to parse mouse control result: ${error.message}`));
+            }
+        }
+    });
+
+    python.stderr.on('data', (data) => {
+        // Keep only the tail for error reporting
+        worker.stderr = (worker.stderr + data.toString()).slice(-4000);
+    });
+
+    const fail = (error) => {
+        if (mouseWorker === worker) mouseWorker = null;
+        for (const job of worker.pending.splice(0)) {
+            job.reject(error);
+        }
+    };
+
+    python.on('close', (code) => {
+        fail(new Error(`Mouse control failed (exit code ${code}): ${worker.stderr}`));
+    });
+
+    python.on('error', (error) => {
+        fail(new Error(`Failed to spawn Python: ${error.message}`));
+    });
+
+    // A worker that dies mid-write raises EPIPE on stdin; unhandled, it would crash the agent
+    python.stdin.on('error', (error) => {
+        fail(new Error(`Failed to write to mouse worker: ${error.message}`));
+    });
+
+    mouseWorker = worker;
+    return worker;
+}
+
+/**
+ * Stop the persistent mouse control worker so the Node process can exit
+ */
+function closeMouseWorker() {
+    if (mouseWorker) {
+        mouseWorker.python.stdin.end();
+        mouseWorker = null;
+    }
+}
+
+/**
+ * Execute mouse action using the persistent Python worker
  * @param {Object} action - Action object from vision model
  * @param {Object} bounds - Window bounds for coordinate translation
  * @returns {Promise<Object>} Execution result
@@ -251,41 +328,10 @@ function executeAction(action, bounds) {
             y: screenY
         });
 
-        // Execute Python script
-        const python = spawn('python', [MOUSE_CONTROL_SCRIPT, actionData]);
-
-        let stdout = '';
-        let stderr = '';
-
-        python.stdout.on('data', (data) => {
-            stdout += data.toString();
-        });
-
-        python.stderr.on('data', (data) => {
-            stderr += data.toString();
-        });
-
-        python.on('close', (code) => {
-            if (code !== 0) {
-                reject(new Error(`Mouse control failed: ${stderr}`));
-                return;
-            }
-
-            try {
-                const result = JSON.parse(stdout);
-                if (result.success) {
-                    resolve(result);
-                } else {
-                    reject(new Error(result.error));
-                }
-            } catch (error) {
-                reject(new Error(`Failed to parse mouse control result: ${error.message}`));
-            }
-        });
-
-        python.on('error', (error) => {
-            reject(new Error(`Failed to spawn Python: ${error.message}`));
-        });
+        // One JSON line per action; results come back in order
+        const worker = getMouseWorker();
+        worker.pending.push({ resolve, reject });
+        worker.python.stdin.write(actionData + '\n');
     });
 }
 
@@ -372,6 +418,9 @@ async function runAgent() {
     console.log("[VISION_AGENT] Agent stopped - reached max events:", MAX_EVENTS);
     console.log("[VISION_AGENT] Total events executed:", eventCount);
     console.log("[VISION_AGENT] ==========================================");
+
+    closeROIWorker();
+    closeMouseWorker();
 }
 
 // Start the agent
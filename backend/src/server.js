@@ -5,6 +5,7 @@ import multer from 'multer';
 import { spawn } from 'child_process';
 import path from 'path';
 import { fileURLToPath } from 'url';
+import { transcribeViaSocket } from './whisper-client.js';
 
 const __filename = fileURLToPath(import.meta.url);
 const __dirname = path.dirname(__filename);
@@ -125,55 +126,88 @@ app.post(
   }
 );
 
-async function transcribeBuffer(buffer, mimetype) {
-  if (!buffer?.length) {
-    return '';
+// Long-lived transcribe.py worker: the Whisper model stays loaded between requests
+let transcriber = null;
+
+function getTranscriber() {
+  if (transcriber) {
+    return transcriber;
   }
 
-  try {
-    // Convert buffer to base64
-    const audioBase64 = buffer.toString('base64');
+  // Path to Python script
+  const scriptPath = path.join(__dirname, '..', 'transcribe.py');
 
-    // Path to Python script
-    const scriptPath = path.join(__dirname, '..', 'transcribe.py');
+  // Spawn Python process once
+  const pythonProcess = spawn('python', [scriptPath], {
+    env: { ...process.env, WHISPER_MODEL: process.env.WHISPER_MODEL || 'distil-small.en' }
+  });
 
-    // Spawn Python process
-    const pythonProcess = spawn('python', [scriptPath], {
-      env: { ...process.env, WHISPER_MODEL: process.env.WHISPER_MODEL || 'base' }
-    });
+  const worker = { pythonProcess, pending: [], stdout: '', stderr: '' };
 
-    let stdout = '';
-    let stderr = '';
+  // One JSON result per stdout line, answered in request order
+  pythonProcess.stdout.on('data', (data) => {
+    worker.stdout += data.toString();
+    let newline;
+    while ((newline = worker.stdout.indexOf('\n')) !== -1) {
+      const line = worker.stdout.slice(0, newline).trim();
+      worker.stdout = worker.stdout.slice(newline + 1);
+      if (!line) continue;
 
-    // Collect stdout
-    pythonProcess.stdout.on('data', (data) => {
-      stdout += data.toString();
-    });
+      const resolve = worker.pending.shift();
+      if (!resolve) continue;
+      try {
+        resolve(JSON.parse(line).text ?? '');
+      } catch (error) {
+        console.error('Failed to parse transcription result:', error);
+        resolve('');
+      }
+    }
+  });
 
-    // Collect stderr
-    pythonProcess.stderr.on('data', (data) => {
-      stderr += data.toString();
-    });
+  // Keep the stderr tail for diagnostics
+  pythonProcess.stderr.on('data', (data) => {
+    worker.stderr = (worker.stderr + data.toString()).slice(-4000);
+  });
 
-    // Write base64 audio to stdin and close
-    pythonProcess.stdin.write(audioBase64);
-    pythonProcess.stdin.end();
+  const fail = (message) => {
+    if (transcriber === worker) transcriber = null;
+    if (worker.pending.length > 0) {
+      console.error(message, worker.stderr);
+    }
+    for (const resolve of worker.pending.splice(0)) {
+      resolve('');
+    }
+  };
 
-    // Wait for process to complete
-    return new Promise((resolve, reject) => {
-      pythonProcess.on('close', (code) => {
-        if (code !== 0) {
-          console.error('Transcription failed:', stderr);
-          resolve('');
-        } else {
-          resolve(stdout.trim());
-        }
-      });
+  pythonProcess.on('close', (code) => fail(`Transcription process exited with code ${code}:`));
+  pythonProcess.on('error', (error) => fail(`Failed to start transcription process: ${error.message}`));
+  // A worker that dies mid-write raises EPIPE on stdin; unhandled, it would crash the server
+  pythonProcess.stdin.on('error', (error) => fail(`Failed to write to transcription process: ${error.message}`));
 
-      pythonProcess.on('error', (error) => {
-        console.error('Failed to start transcription process:', error);
-        resolve('');
-      });
+  transcriber = worker;
+  return worker;
+}
+
+async function transcribeBuffer(buffer, mimetype) {
+  if (!buffer?.length) {
+    return '';
+  }
+
+  try {
+    // Shared `transcribe.py --socket` server, when one is configured
+    if (process.env.WHISPER_SOCKET) {
+      return await transcribeViaSocket(buffer);
+    }
+
+    // One job per frame: 4-byte big-endian length, then the raw audio bytes
+    const header = Buffer.alloc(4);
+    header.writeUInt32BE(buffer.length);
+    const worker = getTranscriber();
+
+    return await new Promise((resolve) => {
+      worker.pending.push(resolve);
+      worker.pythonProcess.stdin.write(header);
+      worker.pythonProcess.stdin.write(buffer);
     });
   } catch (error) {
     console.error('Transcription failed', error);
@@ -183,4 +217,10 @@ async function transcribeBuffer(buffer, mimetype) {
 
 app.listen(port, () => {
   console.log(`Server is running on port ${port}`);
+
+  // Start the transcribe worker now so the model load and warm-up run before
+  // the first request (a WHISPER_SOCKET server is started and warmed separately)
+  if (!process.env.WHISPER_SOCKET) {
+    getTranscriber();
+  }
 });
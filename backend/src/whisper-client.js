@@ -0,0 +1,44 @@
+import net from 'net';
+
+// Socket of a running `python transcribe.py --socket` server
+const socketPath = process.env.WHISPER_SOCKET || '/tmp/whisper.sock';
+
+/**
+ * Transcribe one audio file through the transcribe.py socket server.
+ * One connection per request: send a single frame (4-byte big-endian length,
+ * then the raw audio bytes), read back one JSON line.
+ * @param {Buffer} buffer - Raw audio file bytes
+ * @param {string} [path] - Unix socket path
+ * @returns {Promise<string>} Transcript
+ */
+export function transcribeViaSocket(buffer, path = socketPath) {
+  return new Promise((resolve, reject) => {
+    const socket = net.createConnection(path);
+    socket.setEncoding('utf8');
+    let reply = '';
+
+    socket.on('connect', () => {
+      const header = Buffer.alloc(4);
+      header.writeUInt32BE(buffer.length);
+      socket.write(header);
+      // Half-close after the frame so the server sees EOF and closes once it answers
+      socket.end(buffer);
+    });
+
+    socket.on('data', (data) => {
+      reply += data;
+      const newline = reply.indexOf('\n');
+      if (newline === -1) return;
+
+      socket.destroy();
+      try {
+        resolve(JSON.parse(reply.slice(0, newline)).text ?? '');
+      } catch (error) {
+        reject(new Error(`Failed to parse transcription result: ${error.message}`));
+      }
+    });
+
+    socket.on('error', reject);
+    socket.on('close', () => reject(new Error('Whisper socket closed without a result')));
+  });
+}
@@ -1,23 +1,174 @@
+import os
+
+def physical_cores() -> int:
+    """Physical cores among the usable CPUs, from the SMT sibling lists in sysfs (all usable CPUs if unavailable)."""
+    cpus = os.sched_getaffinity(0) if hasattr(os, "sched_getaffinity") else range(os.cpu_count() or 1)
+    cores = set()
+    for cpu in cpus:
+        try:
+            with open(f"/sys/devices/system/cpu/cpu{cpu}/topology/thread_siblings_list") as f:
+                cores.add(f.read().strip())
+        except OSError:
+            return len(cpus)
+    return len(cores)
+
+# One thread per physical core (TTS_THREADS overrides); must be set before
+# torch brings up its OpenMP/MKL runtimes
+TTS_THREADS = os.environ.get("TTS_THREADS") or str(max(1, physical_cores()))
+for _var in ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS"):
+    os.environ.setdefault(_var, TTS_THREADS)
+
 from fastapi import FastAPI, Request
-from fastapi.responses import StreamingResponse
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from TTS.api import TTS
-import io, os, tempfile
+import asyncio, contextlib, struct, sys, threading
+from functools import lru_cache
+import orjson
+import torch
+
+app = FastAPI(default_response_class=ORJSONResponse)
+
+DEVICE = "cuda" if torch.cuda.is_available() else "cpu"
+# fp32 (default) | fp16 (CUDA autocast) | int8 (CPU dynamic quantization of nn.Linear)
+PRECISION = os.environ.get("TTS_PRECISION", "fp32").lower()
+
+torch.set_float32_matmul_precision("high")
+# cudnn.benchmark stays off: inference_stream re-runs the HiFi-GAN decoder on
+# a latent sequence that grows every chunk, so each new input length would
+# trigger a fresh algorithm search
 
-app = FastAPI()
-tts = TTS("tts_models/multilingual/multi-dataset/xtts_v2")
+tts = TTS("tts_models/multilingual/multi-dataset/xtts_v2").to(DEVICE)
+if PRECISION == "int8" and DEVICE == "cpu":
+    tts.synthesizer.tts_model = torch.quantization.quantize_dynamic(
+        tts.synthesizer.tts_model, {torch.nn.Linear}, dtype=torch.qint8
+    )
 
 # Default speaker wav - using your custom voice sample
 DEFAULT_SPEAKER = "/app/sem-título.wav"
 
+# The TTS model is not reentrant: cap in-flight syntheses (default one at a time)
+_tts_sem = asyncio.Semaphore(int(os.environ.get("XTTS_CONCURRENCY", "1")))
+
+# Reference-audio and sampling settings tts.tts() takes from the model config
+# (Xtts.synthesize); the lower-level model calls below would otherwise fall
+# back to their own defaults and clone/sample the voice differently
+_CFG = tts.synthesizer.tts_config
+SAMPLING = {k: getattr(_CFG, k) for k in ("temperature", "length_penalty", "repetition_penalty", "top_k", "top_p")}
+
+@lru_cache(maxsize=32)
+def _latents(speaker_wav: str, mtime: float):
+    """Conditioning latents for a reference voice; `mtime` invalidates the entry when the wav is replaced."""
+    return tts.synthesizer.tts_model.get_conditioning_latents(
+        audio_path=speaker_wav,
+        gpt_cond_len=_CFG.gpt_cond_len,
+        gpt_cond_chunk_len=_CFG.gpt_cond_chunk_len,
+        max_ref_length=_CFG.max_ref_len,
+        sound_norm_refs=_CFG.sound_norm_refs,
+    )
+
+def speaker_latents(speaker_wav: str):
+    return _latents(speaker_wav, os.path.getmtime(speaker_wav))
+
+def precision_context():
+    """fp16 autocast on CUDA when TTS_PRECISION=fp16 (weights stay fp32, so norms/vocoder keep full precision)."""
+    if PRECISION == "fp16" and DEVICE == "cuda":
+        return torch.autocast("cuda", dtype=torch.float16)
+    return contextlib.nullcontext()
+
+# GPT tokens per streamed chunk; smaller = earlier first audio, more vocoder calls
+STREAM_CHUNK_SIZE = int(os.environ.get("XTTS_STREAM_CHUNK_SIZE", "20"))
+
+def wav_stream_header(sample_rate: int) -> bytes:
+    """RIFF header for 16-bit mono PCM of unknown length (0xFFFFFFFF size placeholders)."""
+    return struct.pack(
+        "<4sI4s4sIHHIIHH4sI",
+        b"RIFF", 0xFFFFFFFF, b"WAVE",
+        b"fmt ", 16, 1, 1, sample_rate, sample_rate * 2, 2, 16,
+        b"data", 0xFFFFFFFF,
+    )
+
+def to_pcm16(chunk) -> bytes:
+    """Convert on the model's device, so only int16 samples cross to the host (half the fp32 bytes, one host copy)."""
+    # upcast first: under fp16 autocast 1.0 * 32767 rounds to 32768, outside int16
+    return (chunk.float().clamp(-1.0, 1.0) * 32767).to(torch.int16).cpu().numpy().tobytes()
+
+def stream_synthesis(text: str, lang: str, speaker_wav: str, emit, stop: threading.Event):
+    """Run inference_stream on the calling (worker) thread, handing each PCM chunk to `emit`."""
+    with torch.inference_mode(), precision_context():
+        gpt_cond_latent, speaker_embedding = speaker_latents(speaker_wav)
+        # split into sentences like tts.tts() does: a whole LLM reply would
+        # otherwise overflow XTTS's 400 text-token limit
+        for chunk in tts.synthesizer.tts_model.inference_stream(
+            text, lang, gpt_cond_latent, speaker_embedding,
+            stream_chunk_size=STREAM_CHUNK_SIZE, enable_text_splitting=True, **SAMPLING,
+        ):
+            if stop.is_set():  # client went away
+                break
+            emit(to_pcm16(chunk))
+
+def warm_up():
+    """One throwaway synthesis at start-up: caches the default speaker's latents and runs every kernel once."""
+    try:
+        stream_synthesis("warmup", "en", DEFAULT_SPEAKER, lambda data: None, threading.Event())
+    except Exception as e:
+        print(f"XTTS warm-up failed: {e}", file=sys.stderr)
+
+warm_up()
+
 @app.post("/v1/audio/speech")
 async def speech(req: Request):
-    b = await req.json()
+    b = orjson.loads(await req.body())
     text = b.get("text","")
     lang = b.get("language","en")
     speaker = b.get("speaker_wav", DEFAULT_SPEAKER)
+    loop = asyncio.get_running_loop()
+
+    # PCM chunks, an Exception if synthesis failed, then None when done
+    queue = asyncio.Queue()
+    stop = threading.Event()
+
+    def emit(data):
+        loop.call_soon_threadsafe(queue.put_nowait, data)
+
+    async def produce():
+        # the semaphore covers the synthesis itself, so it is released even if
+        # the response is never streamed; the whole generator runs on one
+        # thread, so inference_mode/autocast stay in effect
+        try:
+            async with _tts_sem:
+                await asyncio.to_thread(stream_synthesis, text, lang, speaker, emit, stop)
+        except Exception as e:
+            print(f"XTTS synthesis failed: {e}", file=sys.stderr)
+            queue.put_nowait(e)
+        finally:
+            queue.put_nowait(None)
+
+    task = asyncio.create_task(produce())
+
+    # Hold the response until the first chunk exists: latents, speaker path,
+    # language and text-length errors all surface here as a 500, not as a
+    # 200 with an empty WAV
+    try:
+        first = await queue.get()
+    except BaseException:
+        stop.set()
+        raise
+    if not isinstance(first, bytes):
+        stop.set()
+        await task
+        error = str(first) if first is not None else "no audio generated"
+        return ORJSONResponse({"error": f"XTTS synthesis failed: {error}"}, status_code=500)
+
+    async def gen():
+        try:
+            yield wav_stream_header(tts.synthesizer.output_sample_rate)
+            yield first
+            # a failure past this point can only end the stream early (already logged)
+            while isinstance(data := await queue.get(), bytes):
+                yield data
+        finally:
+            stop.set()
+            await task
 
-    tmp = tempfile.NamedTemporaryFile(delete=False, suffix=".wav")
-    tts.tts_to_file(text=text, language=lang, speaker_wav=speaker, file_path=tmp.name)
-    data = open(tmp.name,"rb").read()
-    os.remove(tmp.name)
-    return StreamingResponse(io.BytesIO(data), media_type="audio/wav")
+    # first bytes go out as soon as the first chunk is vocoded
+    return StreamingResponse(gen(), media_type="audio/wav")
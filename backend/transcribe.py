@@ -1,68 +1,290 @@
 #!/usr/bin/env python3
 """
 Audio transcription service using faster-whisper.
-Reads audio from stdin (base64 encoded) and outputs transcription to stdout.
+Runs as a long-lived worker: the model is loaded once, then each stdin frame
+(4-byte big-endian length + raw audio bytes) is one job and each stdout line
+is one JSON result ({"text": ...}).
+
+    python transcribe.py          # length-prefixed raw audio frames
+    python transcribe.py --b64    # legacy: one base64 encoded job per line
+    python transcribe.py --socket # same frames over a Unix socket ($WHISPER_SOCKET)
 """
 
 import sys
+import json
 import base64
-import tempfile
+import io
 import os
-from faster_whisper import WhisperModel
+import struct
+import math
+import shutil
+import socketserver
+import subprocess
+import threading
+
+def physical_core_cpus(cpus: list) -> list:
+    """
+    One logical CPU per physical core among `cpus`, grouped by the SMT sibling
+    lists in sysfs (Linux). Elsewhere, the first psutil.cpu_count(logical=False)
+    CPUs if psutil is installed, else all of `cpus`.
+    """
+    picked, seen = [], set()
+    for cpu in cpus:
+        try:
+            with open(f"/sys/devices/system/cpu/cpu{cpu}/topology/thread_siblings_list") as f:
+                siblings = f.read().strip()
+        except OSError:
+            try:
+                import psutil
+            except ImportError:
+                return list(cpus)
+            return list(cpus)[:psutil.cpu_count(logical=False) or len(cpus)]
+        if siblings not in seen:
+            seen.add(siblings)
+            picked.append(cpu)
+    return picked
+
+# Thread budget: one thread per physical core. GEMM-bound threads gain nothing
+# from SMT siblings and thrash once OpenMP pools oversubscribe the machine
+# (WHISPER_THREADS overrides). Must be set before numpy / ctranslate2 bring
+# up their OpenMP and BLAS runtimes.
+_USABLE_CPUS = sorted(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else list(range(os.cpu_count() or 1))
+_CORE_CPUS = physical_core_cpus(_USABLE_CPUS)
+CPU_THREADS = int(os.environ.get("WHISPER_THREADS") or max(1, len(_CORE_CPUS)))
+for _var in ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS"):
+    os.environ.setdefault(_var, str(CPU_THREADS))
+
+# WHISPER_PIN_CPUS=1 pins the worker to one hardware thread on each of the
+# first CPU_THREADS physical cores (Linux)
+if os.environ.get("WHISPER_PIN_CPUS") == "1" and hasattr(os, "sched_setaffinity"):
+    os.sched_setaffinity(0, _CORE_CPUS[:CPU_THREADS])
+
+import numpy as np
+import ctranslate2
+from faster_whisper import BatchedInferencePipeline, WhisperModel, decode_audio
+
+# Read model size from environment or use default. distil-small.en is
+# English-only; set WHISPER_MODEL=small (or base) for other languages.
+MODEL_SIZE = os.environ.get("WHISPER_MODEL", "distil-small.en")
+
+def pick_compute_type() -> str:
+    """
+    WHISPER_COMPUTE_TYPE if set, else the fastest int8 variant this CTranslate2
+    build supports on the host CPU: "int8" (int8 GEMMs, VNNI where available),
+    falling back to "int8_float32".
 
-def transcribe_audio(audio_base64: str, model_size: str = "base") -> str:
+    CTranslate2 has no 4-bit CPU kernels; for large models int8 is the
+    smallest option here (a Q4 model needs another backend, e.g. whisper.cpp).
     """
-    Transcribe audio from base64 encoded data.
+    forced = os.environ.get("WHISPER_COMPUTE_TYPE")
+    if forced:
+        return forced
+    supported = ctranslate2.get_supported_compute_types("cpu")
+    for compute_type in ("int8", "int8_float32"):
+        if compute_type in supported:
+            return compute_type
+    return "default"
+
+COMPUTE_TYPE = pick_compute_type()
+
+# Decoder beam width; 1 = greedy decoding (much cheaper on CPU than the old beam of 5)
+BEAM_SIZE = int(os.environ.get("WHISPER_BEAM", "1"))
+
+# Clips shorter than this go through the plain (sequential) decoder; batching
+# only pays off once there are several 30 s windows to decode together
+BATCHED_MIN_SECONDS = float(os.environ.get("WHISPER_BATCHED_MIN_SECONDS", "5"))
+SAMPLE_RATE = 16000
+
+# Silero VAD settings: drop pauses longer than 0.5 s (e.g. a push-to-talk button
+# released late), keeping 200 ms of padding around speech so words aren't clipped
+VAD_PARAMETERS = dict(min_silence_duration_ms=500, speech_pad_ms=200)
+
+# Unix socket for --socket mode (see src/whisper-client.js)
+SOCKET_PATH = os.environ.get("WHISPER_SOCKET", "/tmp/whisper.sock")
+
+# ffmpeg binary used for decoding; None falls back to PyAV
+FFMPEG = shutil.which("ffmpeg")
+
+# Loaded models, keyed by size (loading is the expensive part, so do it once)
+_MODELS = {}
+_PIPELINES = {}
+# CTranslate2 models are not reentrant from Python threads
+_MODEL_LOCK = threading.Lock()
+
+def get_model(model_size: str = MODEL_SIZE) -> WhisperModel:
+    """Return the cached model for `model_size`, loading it on first use."""
+    model = _MODELS.get(model_size)
+    if model is None:
+        # CPU with int8 for better performance
+        # For GPU: device="cuda", compute_type="float16"
+        model = WhisperModel(
+            model_size,
+            device="cpu",
+            compute_type=COMPUTE_TYPE,
+            cpu_threads=CPU_THREADS,
+            num_workers=1,
+        )
+        _MODELS[model_size] = model
+    return model
+
+def get_pipeline(model_size: str = MODEL_SIZE) -> BatchedInferencePipeline:
+    """Return the batched pipeline wrapping the cached model for `model_size`."""
+    pipeline = _PIPELINES.get(model_size)
+    if pipeline is None:
+        pipeline = BatchedInferencePipeline(model=get_model(model_size))
+        _PIPELINES[model_size] = pipeline
+    return pipeline
+
+def warm_up(model_size: str = MODEL_SIZE):
+    """
+    Load the model and push a second of silence through it, so CTranslate2's
+    lazy kernel selection / workspace allocation and the Silero VAD load
+    happen at start-up instead of on the first real request.
+    """
+    silence = np.zeros(SAMPLE_RATE, dtype=np.float32)
+    try:
+        with _MODEL_LOCK:
+            # No VAD here: on silence it would drop everything and skip the encoder
+            segments, _ = get_model(model_size).transcribe(silence, beam_size=BEAM_SIZE)
+            list(segments)
+            # Batched path with VAD, as used for longer clips
+            segments, _ = get_pipeline(model_size).transcribe(silence, batch_size=1, vad_filter=True)
+            list(segments)
+    except Exception as e:
+        print(f"Warm-up failed: {str(e)}", file=sys.stderr)
+
+def decode_with_ffmpeg(audio_data: bytes) -> np.ndarray:
+    """
+    Decode any container/codec to 16 kHz mono float32 samples with a single
+    ffmpeg process (stdin -> stdout), instead of PyAV's per-frame Python loop.
+    """
+    pcm = subprocess.run(
+        [FFMPEG, "-hide_banner", "-loglevel", "error", "-i", "pipe:0",
+         "-f", "s16le", "-ac", "1", "-ar", str(SAMPLE_RATE), "pipe:1"],
+        input=audio_data,
+        capture_output=True,
+        check=True,
+    ).stdout
+    return np.frombuffer(pcm, dtype=np.int16).astype(np.float32) / 32768.0
+
+def decode_with_pyav(audio_data: bytes) -> np.ndarray:
+    """Fallback decoder (faster-whisper's PyAV path) when ffmpeg is not installed."""
+    # PyAV reads file-like objects, so the audio never touches the disk
+    return decode_audio(io.BytesIO(audio_data), sampling_rate=SAMPLE_RATE)
+
+def decode(audio_data: bytes) -> np.ndarray:
+    """
+    Decode with the ffmpeg pipe when available, else (or when it fails) with
+    PyAV. A pipe can't be seeked, so e.g. MP4/M4A files with the moov atom at
+    the end come out of ffmpeg empty; PyAV reads them from a seekable BytesIO.
+    """
+    if FFMPEG:
+        try:
+            audio = decode_with_ffmpeg(audio_data)
+            if len(audio):
+                return audio
+        except subprocess.CalledProcessError as e:
+            print(f"ffmpeg decode failed, retrying with PyAV: {e.stderr.decode(errors='replace').strip()}", file=sys.stderr)
+    return decode_with_pyav(audio_data)
+
+def transcribe_audio(audio_data: bytes, model_size: str = MODEL_SIZE) -> str:
+    """
+    Transcribe audio from the raw bytes of an audio file.
 
     Args:
-        audio_base64: Base64 encoded audio file
-        model_size: Whisper model size (tiny, base, small, medium, large-v2, large-v3)
+        audio_data: Audio file contents (any container/codec ffmpeg can read)
+        model_size: Whisper model (tiny, base, small, medium, large-v3, distil-small.en, distil-large-v3, ...)
 
     Returns:
         Transcribed text
     """
     try:
-        # Decode base64 audio
-        audio_data = base64.b64decode(audio_base64)
+        # Decode once up front so the clip length is known
+        audio = decode(audio_data)
+        duration = len(audio) / SAMPLE_RATE
 
-        # Write to temporary file
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.webm') as temp_file:
-            temp_file.write(audio_data)
-            temp_path = temp_file.name
-
-        try:
-            # Initialize model (CPU with int8 for better performance)
-            # For GPU: device="cuda", compute_type="float16"
-            model = WhisperModel(model_size, device="cpu", compute_type="int8")
+        options = dict(
+            beam_size=BEAM_SIZE,
+            best_of=1,
+            temperature=0.0,
+            condition_on_previous_text=False,
+            vad_filter=True,  # skip silent frames
+            vad_parameters=VAD_PARAMETERS,
+        )
 
+        with _MODEL_LOCK:
             # Transcribe
-            segments, info = model.transcribe(temp_path, beam_size=5)
+            if duration >= BATCHED_MIN_SECONDS:
+                # Decode the 30 s windows in batches instead of one by one
+                batch_size = min(8, math.ceil(duration / 30))
+                segments, info = get_pipeline(model_size).transcribe(
+                    audio, batch_size=batch_size, **options
+                )
+            else:
+                segments, info = get_model(model_size).transcribe(audio, **options)
 
-            # Collect all segments
+            # Collect all segments (decoding happens lazily while iterating)
             transcription = " ".join([segment.text for segment in segments])
 
-            return transcription.strip()
-
-        finally:
-            # Clean up temporary file
-            if os.path.exists(temp_path):
-                os.unlink(temp_path)
+        return transcription.strip()
 
     except Exception as e:
         print(f"Error during transcription: {str(e)}", file=sys.stderr)
         return ""
 
-if __name__ == "__main__":
-    # Read model size from environment or use default
-    model_size = os.environ.get("WHISPER_MODEL", "base")
+def read_frames(stream):
+    """Yield length-prefixed payloads (4-byte big-endian length, then N bytes) until EOF."""
+    while True:
+        header = stream.read(4)
+        if len(header) < 4:
+            return
+        (length,) = struct.unpack(">I", header)
+        payload = stream.read(length)
+        if len(payload) < length:
+            return
+        yield payload
+
+def write_result(text: str):
+    sys.stdout.write(json.dumps({"text": text}) + "\n")
+    sys.stdout.flush()
+
+class TranscribeHandler(socketserver.StreamRequestHandler):
+    """One client connection: frames in, one JSON line out per frame."""
 
-    # Read base64 audio from stdin
-    audio_base64 = sys.stdin.read().strip()
+    def handle(self):
+        for audio_data in read_frames(self.rfile):
+            text = transcribe_audio(audio_data, MODEL_SIZE)
+            self.wfile.write((json.dumps({"text": text}) + "\n").encode("utf-8"))
 
-    if not audio_base64:
-        print("Error: No audio data provided", file=sys.stderr)
-        sys.exit(1)
+def serve_socket(path: str = SOCKET_PATH):
+    """Serve transcriptions on a Unix socket; each connection gets its own thread (jobs still share _MODEL_LOCK)."""
+    if os.path.exists(path):
+        os.unlink(path)  # stale socket left by a previous run
+    with socketserver.ThreadingUnixStreamServer(path, TranscribeHandler) as server:
+        server.daemon_threads = True
+        print(f"Listening on {path}", file=sys.stderr)
+        server.serve_forever()
+
+if __name__ == "__main__":
+    # Load and warm the model before the first job arrives
+    warm_up(MODEL_SIZE)
 
-    # Transcribe and output result
-    result = transcribe_audio(audio_base64, model_size)
-    print(result)
+    if "--socket" in sys.argv[1:]:
+        serve_socket()
+    elif "--b64" in sys.argv[1:]:
+        # Legacy wire format: one base64 audio job per line
+        for line in sys.stdin:
+            audio_base64 = line.strip()
+            if not audio_base64:
+                continue
+            try:
+                audio_data = base64.b64decode(audio_base64)
+            except ValueError as e:
+                print(f"Invalid base64 job: {str(e)}", file=sys.stderr)
+                write_result("")
+                continue
+            write_result(transcribe_audio(audio_data, MODEL_SIZE))
+    else:
+        # Raw bytes, no base64 inflate/decode pass
+        for audio_data in read_frames(sys.stdin.buffer):
+            write_result(transcribe_audio(audio_data, MODEL_SIZE))